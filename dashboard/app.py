@@ -6,17 +6,16 @@ import plotly.graph_objects as go
 
 # From shiny, import just reactive and render
 from shiny import reactive, render
+from shiny.session import get_current_session
 
 # From shiny.express, import just ui and inputs if needed
 from shiny.express import ui
 
-import random
+import asyncio
 from datetime import datetime
-from collections import deque
+import numpy as np
 import pandas as pd
-import plotly.express as px
 from shinywidgets import render_plotly
-from scipy import stats
 
 # --------------------------------------------
 # Import icons as you like
@@ -25,6 +24,15 @@ from scipy import stats
 # https://fontawesome.com/v4/cheatsheet/
 from faicons import icon_svg
 
+# --------------------------------------------
+# Build static UI pieces once at the top
+# so the layout below only references them
+# --------------------------------------------
+
+CLOUD_ICON = icon_svg("cloud")
+CARD_STYLE = ui.tags.style(
+    ".card-header { color:black; background:#FFFFE0 !important; }")
+
 # --------------------------------------------
 # Shiny EXPRESS VERSION
 # --------------------------------------------
@@ -37,51 +45,234 @@ from faicons import icon_svg
 
 UPDATE_INTERVAL_SECS: int = 1
 
+# Month abbreviations for formatting the current time without strftime
+_MONTHS = ("Jan", "Feb", "Mar", "Apr", "May", "Jun",
+           "Jul", "Aug", "Sep", "Oct", "Nov", "Dec")
+
 # --------------------------------------------
-# Initialize a REACTIVE VALUE with a common data structure
-# The reactive value is used to store state (information)
+# Define a RING BUFFER with a common data structure
+# The buffer is used to store state (information)
 # Used by all the display components that show this live data.
-# This reactive value is a wrapper around a DEQUE of readings
+# Two fixed-size NumPy arrays hold the readings, so appending
+# never allocates and pandas can wrap them without inspecting rows.
+# head is the next slot to write, count is how many slots are filled.
 # --------------------------------------------
 
 DEQUE_SIZE: int = 10
-reactive_value_wrapper = reactive.value(deque(maxlen=DEQUE_SIZE))
+
+
+class ReadingBuffer:
+    """Fixed-size ring buffer of (temperature, timestamp) readings"""
+
+    def __init__(self, size: int):
+        self.size = size
+        self.temps = np.empty(size, dtype=np.float32)
+        self.times = np.empty(size, dtype="datetime64[s]")
+        self.head = 0
+        self.count = 0
+
+    def append(self, temp, timestamp: datetime):
+        """Write a reading into the next slot and advance the head"""
+        self.temps[self.head] = temp
+        self.times[self.head] = np.datetime64(timestamp, "s")
+        self.head = (self.head + 1) % self.size
+        self.count = min(self.count + 1, self.size)
+
+    def snapshot(self):
+        """Return copies of the temps and times, oldest first"""
+        # Once the buffer is full the oldest reading sits at head,
+        # so join the two halves (head to end, then start to head)
+        # to keep the rows in time order.
+        # Both branches return copies, so later writes to the buffer
+        # don't change a DataFrame already handed out.
+        if self.count == self.size:
+            temps = np.concatenate((self.temps[self.head:], self.temps[:self.head]))
+            times = np.concatenate((self.times[self.head:], self.times[:self.head]))
+        else:
+            temps = self.temps[:self.count].copy()
+            times = self.times[:self.count].copy()
+        return temps, times
+
 
 # --------------------------------------------
-# Initialize a REACTIVE CALC that all display components can call
-# to get the latest data and display it.
-# The calculation is invalidated every UPDATE_INTERVAL_SECS
-# to trigger updates.
-# It returns a tuple with everything needed to display the data.
-# Very easy to expand or modify.
+# Define a POOL of random temperatures
+# Drawing a whole batch at once from a NumPy Generator is cheaper
+# than one Python-level random call per reading.
+# The producer takes one value per reading and refills when empty.
 # --------------------------------------------
 
+RANDOM_POOL_SIZE: int = 1024
+
+
+class TemperaturePool:
+    """Batch of simulated temperatures handed out one at a time"""
+
+    def __init__(self, size: int):
+        self.size = size
+        self.rng = np.random.default_rng()
+        self.values = self._draw()
+        self.index = 0
+
+    def _draw(self):
+        # float32 like the ring buffer, so nothing downstream moves float64
+        return self.rng.uniform(17, 23, self.size).round(1).astype(np.float32)
+
+    def next(self):
+        """Return the next temperature, refilling the pool when it runs out"""
+        if self.index == self.size:
+            self.values = self._draw()
+            self.index = 0
+        temp = self.values[self.index]
+        self.index += 1
+        return temp
+
+
+# --------------------------------------------
+# Create this client's buffer and temperature pool.
+# Shiny Express runs this file once for every session, so each
+# connected client gets its own buffer, pool, and reactive values below;
+# one client's ticks never invalidate another client's outputs.
+# Keep per-client state here, not in an imported module.
+# --------------------------------------------
+
+reading_buffer = ReadingBuffer(DEQUE_SIZE)
+temperature_pool = TemperaturePool(RANDOM_POOL_SIZE)
+
+# --------------------------------------------
+# Initialize REACTIVE VALUES for the latest reading.
+# The value boxes read only these two scalars, so they never
+# depend on the history snapshot or touch pandas.
+# --------------------------------------------
+
+latest_temp = reactive.value(np.float32(0.0))
+latest_ts = reactive.value(datetime.now())
+
+# --------------------------------------------
+# Define the SENSOR READ as a coroutine.
+# For now it only takes the next simulated value from the pool.
+# A real sensor or web API call can be awaited here; it runs in
+# the producer task below, outside any reactive flush, so a slow
+# read never holds up rendering.
+# --------------------------------------------
 
-@reactive.calc()
-def reactive_calc_combined():
-    # Invalidate this calculation every UPDATE_INTERVAL_SECS to trigger updates
-    reactive.invalidate_later(UPDATE_INTERVAL_SECS)
 
-    # Data generation logic
-    temp = round(random.uniform(17, 23), 1)
-    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    new_dictionary_entry = {"Temp":temp, "Timestamp":timestamp}
+async def read_temperature():
+    return temperature_pool.next()
 
-    # get the deque and append the new entry
-    reactive_value_wrapper.get().append(new_dictionary_entry)
 
-    # Get a snapshot of the current deque for any further processing
-    deque_snapshot = reactive_value_wrapper.get()
+# --------------------------------------------
+# Start a PRODUCER TASK that records one new reading
+# every UPDATE_INTERVAL_SECS.
+# It runs on the event loop, apart from the reactive graph, and only
+# touches reactive state once a reading has arrived: it takes the
+# reactive lock, stores the reading, sets the reactive values, and
+# flushes. Every display component depends on those values, directly
+# or indirectly, so the graph is invalidated once per new reading.
+# Shiny re-runs every invalidated output and effect in one flush,
+# so the value boxes, the table, and the chart updates for a reading
+# all go out in that same flush. Keep it that way: don't add a second producer or timer.
+# The task belongs to this session and is cancelled when it ends.
+# --------------------------------------------
+
+
+async def _produce_readings():
+    while True:
+        # Data acquisition logic
+        temp = await read_temperature()
+        timestamp = datetime.now()
+
+        async with reactive.lock():
+            # write the new reading into the ring buffer
+            reading_buffer.append(temp, timestamp)
+
+            # Publish the latest reading; the timestamp changes every reading,
+            # so it is also the signal that the buffer has new data
+            latest_temp.set(temp)
+            latest_ts.set(timestamp)
+            await reactive.flush()
+
+        await asyncio.sleep(UPDATE_INTERVAL_SECS)
 
-    # For Display: Convert deque to DataFrame for display
-    df = pd.DataFrame(deque_snapshot)
 
-    # For Display: Get the latest dictionary entry
-    latest_dictionary_entry = new_dictionary_entry
+_producer = asyncio.create_task(_produce_readings())
+get_current_session().on_ended(_producer.cancel)
+
+
+# --------------------------------------------
+# Initialize a REACTIVE CALC that snapshots the ring buffer.
+# Only the table and the charts call this, so the snapshot is
+# built once per tick and shared between them.
+# It returns a tuple: the DataFrame for the table, plus the raw
+# Temp and Timestamp arrays so the charts skip Series overhead.
+# --------------------------------------------
+
+
+@reactive.calc()
+def history():
+    # Depend on the latest timestamp so we rebuild after every new reading
+    latest_ts()
+
+    # Copy the readings out of the buffer in time order
+    temps, times = reading_buffer.snapshot()
+
+    # For Display: Build the table from display-ready columns.
+    # The grid serializes with to_json, which would send float32 noise
+    # (20.1000003815) and datetime64 as epoch milliseconds, so round
+    # Temp as float64 and format Timestamp as text. The charts keep
+    # the raw arrays.
+    df = pd.DataFrame({
+        "Temp": temps.astype(np.float64).round(1),
+        "Timestamp": pd.Series(times).dt.strftime("%Y-%m-%d %H:%M:%S"),
+    })
 
     # Return a tuple with everything we need
-    # Every time we call this function, we'll get all these values
-    return deque_snapshot, df, latest_dictionary_entry
+    return df, temps, times
+
+
+# --------------------------------------------
+# Create this client's trend chart ONCE.
+# The traces and layout never change, only the data does,
+# so the render function returns this same widget once and a
+# reactive effect updates its trace arrays in place; just those
+# arrays are sent to the browser each tick.
+# Like the buffer, it is created per session when this file runs.
+# Scattergl draws with WebGL, so the chart stays responsive
+# if DEQUE_SIZE grows to thousands of points.
+# --------------------------------------------
+
+_PLOT_LAYOUT = dict(
+    title="Temperature Readings with Regression Line",
+    xaxis_title="Time",
+    yaxis_title="Temperature (°C)",
+    # The traces get float32 arrays; show one decimal on hover
+    # rather than values like 20.299999
+    yaxis_hoverformat=".1f",
+)
+
+trend_fig = go.FigureWidget(
+    data=[
+        # Readings: no legend entry, "Label=value" hover text
+        go.Scattergl(
+            mode="markers",
+            marker_color="purple",
+            showlegend=False,
+            hovertemplate="Time=%{x}<br>Temperature (°C)=%{y:.1f}<extra></extra>",
+        ),
+        go.Scattergl(mode="lines", name="Regression Line"),
+    ],
+    layout=_PLOT_LAYOUT,
+)
+
+# The table's options are fixed too; only its DataFrame changes.
+# Shiny has no call to swap a DataGrid's data in place, so the
+# render function passes the same options dict every tick.
+_DATAGRID_OPTS = dict(width="90%")
+
+# The pie chart is created once the same way; only its values change.
+pie_fig = go.FigureWidget(
+    data=[go.Pie(labels=['Days over 20 Celsius', 'Days under 20 Celsius'], values=[0, 0])],
+    layout=dict(title='Temperature Distribution'),
+)
 
 
 
@@ -127,7 +318,7 @@ with ui.sidebar(open="open", bg="#f8f8f8"):
 
 with ui.layout_columns():
     with ui.value_box(
-        showcase=icon_svg("cloud"),
+        showcase=CLOUD_ICON,
          theme="bg-gradient-red-orange",
     ):
 
@@ -136,15 +327,14 @@ with ui.layout_columns():
         @render.text
         def display_temp():
             """Get the latest reading and return a temperature string"""
-            deque_snapshot, df, latest_dictionary_entry = reactive_calc_combined()
-            return f"{latest_dictionary_entry['Temp']} C"
+            # float32 can't hold 0.1 steps exactly, so show one decimal
+            return f"{latest_temp():.1f} C"
 
         "Warmer than usual"
 
     #Add new style for tags
-    ui.tags.style(
-    ".card-header { color:black; background:#FFFFE0 !important; }")
-  
+    CARD_STYLE
+
 
     with ui.card(full_screen=True):
         ui.card_header("Current Date and Time")
@@ -152,15 +342,17 @@ with ui.layout_columns():
         @render.text
         def display_time():
             """Get the latest reading and return a timestamp string"""
-            deque_snapshot, df, latest_dictionary_entry = reactive_calc_combined()
-            timestamp = latest_dictionary_entry['Timestamp']
-    
-            # Convert timestamp string to datetime object
-            timestamp_datetime = datetime.strptime(timestamp, '%Y-%m-%d %H:%M:%S')
-    
-            # Format the datetime object as per your preference
-            formatted_timestamp = timestamp_datetime.strftime('%b %d, %Y %I:%M:%S %p')  # Example format
-            
+            timestamp = latest_ts()
+
+            # Format the datetime object as "%b %d, %Y %I:%M:%S %p"
+            # straight from its fields, without walking a format string
+            hour_12 = (timestamp.hour - 1) % 12 + 1
+            am_pm = "AM" if timestamp.hour < 12 else "PM"
+            formatted_timestamp = (
+                f"{_MONTHS[timestamp.month - 1]} {timestamp.day:02d}, {timestamp.year} "
+                f"{hour_12:02d}:{timestamp.minute:02d}:{timestamp.second:02d} {am_pm}"
+            )
+
             return formatted_timestamp
 
 with ui.card(full_screen=True, min_height="10%"):
@@ -169,54 +361,56 @@ with ui.card(full_screen=True, min_height="10%"):
     @render.data_frame
     def display_df():
         """Get the latest reading and return a dataframe with current readings"""
-        deque_snapshot, df, latest_dictionary_entry = reactive_calc_combined()
-        pd.set_option('display.width', None)        # Use maximum width
-        return render.DataGrid( df,width="90%")
+        df, _, _ = history()
+        return render.DataGrid(df, **_DATAGRID_OPTS)
 
 with ui.card(full_screen=True, min_height="20%"):
     ui.card_header("Chart with Current Trend")
 
     @render_plotly
     def display_plot():
+        # Render the chart once; it reads no reactive values,
+        # so it never re-renders. _update_plot fills in the data.
+        return trend_fig
+
+    @reactive.effect
+    def _update_plot():
         # Fetch from the reactive calc function
-        deque_snapshot, df, latest_dictionary_entry = reactive_calc_combined()
-
-        # Ensure the DataFrame is not empty before plotting
-        if not df.empty:
-            # Convert the 'timestamp' column to datetime for better plotting
-            df["Timestamp"] = pd.to_datetime(df["Timestamp"])
-
-            # Create scatter plot for readings
-            # pass in the df, the name of the x column, the name of the y column,
-            # and more
-        
-            fig = px.scatter(df,
-            x="Timestamp",
-            y="Temp",
-            title="Temperature Readings with Regression Line",
-            labels={"Temp": "Temperature (°C)", "Timestamp": "Time"},
-            color_discrete_sequence=["purple"] )
-            
-            # Linear regression - we need to get a list of the
-            # Independent variable x values (time) and the
-            # Dependent variable y values (temp)
-            # then, it's pretty easy using scipy.stats.linregress()
-
-            # For x let's generate a sequence of integers from 0 to len(df)
-            sequence = range(len(df))
-            x_vals = list(sequence)
-            y_vals = df["Temp"]
-
-            slope, intercept, r_value, p_value, std_err = stats.linregress(x_vals, y_vals)
-            df['best_fit_line'] = [slope * x + intercept for x in x_vals]
-
-            # Add the regression line to the figure
-            fig.add_scatter(x=df["Timestamp"], y=df['best_fit_line'], mode='lines', name='Regression Line')
-
-            # Update layout as needed to customize further
-            fig.update_layout(xaxis_title="Time",yaxis_title="Temperature (°C)")
-
-        return fig
+        _, temps, times = history()
+
+        # Ensure there are readings before plotting
+        if not temps.size:
+            return
+
+        # Linear regression - we need to get an array of the
+        # Independent variable x values (time) and the
+        # Dependent variable y values (temp)
+        # then, the closed-form least squares fit is just a few NumPy ops
+
+        # For x let's generate a sequence of integers from 0 to the number of readings
+        n = temps.size
+        x_vals = np.arange(n, dtype=np.float32)
+        y_vals = temps
+
+        x_mean = x_vals.mean()
+        y_mean = y_vals.mean()
+        x_dev = x_vals - x_mean
+
+        # A single reading has no spread in x, so draw a flat line through it
+        denominator = (x_dev**2).sum()
+        slope = (x_dev * (y_vals - y_mean)).sum() / denominator if n > 1 else 0.0
+        intercept = y_mean - slope * x_mean
+        best_fit_line = x_vals * slope + intercept
+
+        # Update the readings and the regression line together,
+        # so the browser redraws once instead of once per property
+        # Write to trend_fig directly rather than display_plot.widget,
+        # which registers the calling context on every read
+        with trend_fig.batch_update():
+            trend_fig.data[0].x = times
+            trend_fig.data[0].y = temps
+            trend_fig.data[1].x = times
+            trend_fig.data[1].y = best_fit_line
 
 # Add the rendering function to the UI layout
 with ui.card(full_screen=True, min_height="15%"):
@@ -225,17 +419,19 @@ with ui.card(full_screen=True, min_height="15%"):
     # Define a new rendering function for the pie chart
     @render_plotly
     def display_pie_chart():
-        # Fetch the DataFrame from the reactive calculation
-        deque_snapshot, df, latest_dictionary_entry = reactive_calc_combined()
-    
+        # Render the pie once; _update_pie_chart fills in the values
+        return pie_fig
+
+    @reactive.effect
+    def _update_pie_chart():
+        # Fetch the Temp array from the reactive calculation
+        _, temps, _ = history()
+
         # Count the number of values over and under 20 degrees
-        over_20 = len(df[df['Temp'] > 20])
-        under_20 = len(df[df['Temp'] <= 20])
-
-        
-        # Create a pie chart with icon in label
-        fig = go.Figure(data=[go.Pie(labels=['Days over 20 Celsius', 'Days under 20 Celsius'], values=[over_20, under_20])])
-                                             
-        fig.update_layout(title='Temperature Distribution')
-        
-        return fig
\ No newline at end of file
+        # One comparison on the raw float32 array, count the True values,
+        # and the rest are under
+        over_20 = int(np.count_nonzero(temps > 20))
+        under_20 = temps.size - over_20
+
+        # Update the slice sizes on the existing pie chart
+        pie_fig.data[0].values = [over_20, under_20]